@@ -57,12 +57,14 @@ def main():
         merger = LTLfSpecMerger(share_ratio=args.share_ratio)
         merged_ltlf, merged_part = merger.merge_specs(spec_pairs)
 
-        # Write output to files
+        # Write output to files; a 1 MiB buffer lets each file go out in one
+        # write even for large merged formulas
+        os.makedirs(args.output_folder, exist_ok=True)
         merged_ltlf_path = os.path.join(args.output_folder, f'{args.output_base_filename}.ltlf')
-        with open(merged_ltlf_path, 'w') as f:
+        with open(merged_ltlf_path, 'w', buffering=1 << 20) as f:
             f.write(merged_ltlf)
         merged_part_path = os.path.join(args.output_folder, f'{args.output_base_filename}.part')
-        with open(merged_part_path, 'w') as f:
+        with open(merged_part_path, 'w', buffering=1 << 20) as f:
             f.write(merged_part)
 
         print("Successfully merged specifications:")
